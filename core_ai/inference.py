@@ -1,3 +1,20 @@
+# part of every cache key for explain() output: bump it whenever the
+# advisor (template, model or prompt) changes so old answers are not reused
+ADVISOR_VERSION = "template-1"
+
+
 def explain(vuln):
     return f"The parameter '{vuln['param']}' in {vuln['url']} is vulnerable. " \
            "Mitigation: use parameterized queries."
+
+
+def explain_batch(vulns):
+    # single entry point for many findings, so a model-backed advisor can
+    # answer them in one request/forward pass; results keep input order
+    return [explain(v) for v in vulns]
+
+
+def explain_key(vuln):
+    # the fields explain() actually reads: findings that agree on these get
+    # the same answer, so callers can explain each key once and fan out
+    return (vuln.get("url"), vuln.get("param"))
@@ -1,3 +1,3 @@
-def crawl(url):
+def crawl(url, session=None):
     # Temporary: return one fake endpoint
     return [{"url": url, "params": ["id"]}]
@@ -6,160 +6,164 @@ Build a payload catalog JSON from SQLMap-style XML payload files found in:
 Writes:
   core_sql/payloads_catalog.json
 
+Run from the project root:
+  python -m core_sql.build_payload_catalog
+
 Includes:
  - entries: list of payload dicts (id, title, type, dbms, dbms_version, vector, example, grep, level, risk, tags, inferred)
  - indexes: by_type, by_dbms, by_tag
  - metadata: generated_at, count
 """
-import os, json, uuid, re
+import os, json, uuid, bisect
 from pathlib import Path
 from datetime import datetime
-import xml.etree.ElementTree as ET
+from typing import Iterator
+
+# technique inference and streaming xml helpers are shared with the runtime
+# loader, so the catalog and PayloadDB always classify entries the same way
+from core_sql.payloads import (
+    EXPECTED_XML, TECH_BITS, _decode_bits, _infer_techniques, _iter_tests, _first_children, _text,
+)
+
+try:
+    import orjson  # optional, much faster encoder for the large catalog dict
+except ImportError:
+    orjson = None
 
 BASE = Path(__file__).resolve().parent  # points to core_sql/
 PAYLOAD_DIR = BASE / "payloads"
 OUT_FILE = BASE / "payloads_catalog.json"
 
-EXPECTED_XML = [
-    "boolean_blind.xml",
-    "error_based.xml",
-    "inline_query.xml",
-    "stacked_queries.xml",
-    "time_blind.xml",
-    "union_query.xml",
-]
-
-TECH_KEYWORDS = {
-    "time_blind": [r"\bSLEEP\b", r"\bPG_SLEEP\b", r"\bWAITFOR\s+DELAY\b", r"\bBENCHMARK\b", r"\[SLEEPTIME\]"],
-    "union_query": [r"\bUNION\b", r"\bCONCAT\b", r"\bGROUP_CONCAT\b", r"\[DELIMITER_START\]"],
-    "boolean_blind": [r"\[INFERENCE\]", r"\bIF\(", r"\bELT\(", r"\bCASE\s+WHEN\b"],
-    "error_based": [r"CAST\(|CONVERT\(|JSON_KEYS|ORA-|SQLSTATE|ERROR"],
-    "stacked_queries": [r"^\s*;", r";SELECT\b", r";\s*SELECT"],
-    "inline_query": [r"SELECT\s+\(", r"\bINLINE\b"]
-}
+def iter_entries(path: Path, ptype_hint: str) -> Iterator[dict]:
+    """Yield catalog entries from one payload xml as each <test> closes.
+    Parse errors propagate to the caller."""
+    for test in _iter_tests(str(path)):
+        entry = _entry_from_test(test, path, ptype_hint)
+        if entry is not None:
+            yield entry
 
-def parse_xml_file(path: Path, ptype_hint: str):
-    try:
-        tree = ET.parse(str(path))
-        root = tree.getroot()
-    except Exception as e:
-        print("skip", path, ":", e)
-        return []
-
-    out = []
-    for test in root.findall("test"):
-        entry = {
-            "id": str(uuid.uuid4()),
-            "title": (test.findtext("title") or "").strip(),
-            "type": ptype_hint,
-            "dbms": None,
-            "dbms_version": None,
-            "vector": None,
-            "example": None,
-            "grep": None,
-            "level": None,
-            "risk": None,
-            "source": path.name,
-            "tags": [],
-            "inferred": []
-        }
-        # vector
-        v = test.find("vector")
-        if v is not None and v.text:
-            entry["vector"] = v.text.strip()
-        # request/payload
-        req = test.find("request")
-        if req is not None:
-            p = req.find("payload")
-            if p is not None and p.text:
-                entry["example"] = p.text.strip()
-            c = req.find("comment")
-            if c is not None and c.text:
-                entry["tags"].append("comment_token:" + c.text.strip())
-        # response
-        resp = test.find("response")
-        if resp is not None:
-            g = resp.find("grep")
-            if g is not None and g.text:
-                entry["grep"] = g.text.strip()
-            t = resp.find("time")
-            if t is not None and t.text:
-                entry["tags"].append("response_time_marker")
-        # details
-        det = test.find("details")
-        if det is not None:
-            db = det.findtext("dbms")
-            dv = det.findtext("dbms_version")
-            if db:
-                entry["dbms"] = db.strip()
-                entry["tags"].append("dbms:" + db.strip())
-            if dv:
-                entry["dbms_version"] = dv.strip()
-        # level/risk
-        lvl = test.findtext("level")
-        rsk = test.findtext("risk")
-        entry["level"] = int(lvl) if lvl and lvl.isdigit() else None
-        entry["risk"] = int(rsk) if rsk and rsk.isdigit() else None
+def _entry_from_test(test, path: Path, ptype_hint: str):
+    entry = {
+        "id": str(uuid.uuid4()),
+        "title": None,
+        "type": ptype_hint,
+        "dbms": None,
+        "dbms_version": None,
+        "vector": None,
+        "example": None,
+        "grep": None,
+        "level": None,
+        "risk": None,
+        "source": path.name,
+        "tags": [],
+        "inferred": []
+    }
+    kids = _first_children(test)
+    entry["title"] = (_text(kids, "title") or "").strip()
+    # vector
+    vec = _text(kids, "vector")
+    if vec:
+        entry["vector"] = vec.strip()
+    # request/payload
+    req = kids.get("request")
+    if req is not None:
+        req_kids = _first_children(req)
+        p = _text(req_kids, "payload")
+        if p:
+            entry["example"] = p.strip()
+        c = _text(req_kids, "comment")
+        if c:
+            entry["tags"].append("comment_token:" + c.strip())
+    # response
+    resp = kids.get("response")
+    if resp is not None:
+        resp_kids = _first_children(resp)
+        g = _text(resp_kids, "grep")
+        if g:
+            entry["grep"] = g.strip()
+        if _text(resp_kids, "time"):
+            entry["tags"].append("response_time_marker")
+    # details
+    det = kids.get("details")
+    if det is not None:
+        det_kids = _first_children(det)
+        db = _text(det_kids, "dbms")
+        dv = _text(det_kids, "dbms_version")
+        if db:
+            entry["dbms"] = db.strip()
+            entry["tags"].append("dbms:" + db.strip())
+        if dv:
+            entry["dbms_version"] = dv.strip()
+    # level/risk
+    lvl = _text(kids, "level")
+    rsk = _text(kids, "risk")
+    entry["level"] = int(lvl) if lvl and lvl.isdigit() else None
+    entry["risk"] = int(rsk) if rsk and rsk.isdigit() else None
 
-        # infer techniques by scanning vector+example
-        content = " ".join(filter(None, [entry["vector"] or "", entry["example"] or ""]))
-        inferred = set()
-        for t, patterns in TECH_KEYWORDS.items():
-            for pat in patterns:
-                if re.search(pat, content, re.I | re.M):
-                    inferred.add(t)
-                    break
-        # prefer ptype_hint
-        if ptype_hint:
-            inferred.add(ptype_hint)
-        # stacked special case
-        if "stacked" in ptype_hint:
-            inferred.add("stacked_queries")
-        entry["inferred"] = sorted(list(inferred))
+    # infer techniques by scanning vector+example
+    content = " ".join(filter(None, [entry["vector"] or "", entry["example"] or ""]))
+    bits = _infer_techniques(content)
+    # prefer ptype_hint
+    if ptype_hint in TECH_BITS:
+        bits |= TECH_BITS[ptype_hint]
+    # stacked special case
+    if "stacked" in ptype_hint:
+        bits |= TECH_BITS["stacked_queries"]
+    inferred = _decode_bits(bits)
+    # a non-standard file name is still recorded as a technique
+    if ptype_hint and ptype_hint not in TECH_BITS:
+        bisect.insort(inferred, ptype_hint)
+    entry["inferred"] = inferred
 
-        # basic safety heuristic from risk
-        if entry["risk"] is not None:
-            if entry["risk"] <= 2:
-                entry["safety"] = "non-destructive"
-            elif entry["risk"] <= 4:
-                entry["safety"] = "may-alter-db"
-            else:
-                entry["safety"] = "destructive"
-        else:
+    # basic safety heuristic from risk
+    if entry["risk"] is not None:
+        if entry["risk"] <= 2:
             entry["safety"] = "non-destructive"
+        elif entry["risk"] <= 4:
+            entry["safety"] = "may-alter-db"
+        else:
+            entry["safety"] = "destructive"
+    else:
+        entry["safety"] = "non-destructive"
 
-        # only keep entries with a vector or example
-        if entry["vector"] or entry["example"]:
-            out.append(entry)
-    return out
+    # only keep entries with a vector or example
+    if entry["vector"] or entry["example"]:
+        return entry
+    return None
+
+def _index_entry(e: dict, by_type: dict, by_dbms: dict, by_tag: dict):
+    # the file type is usually also among the inferred techniques, so dedupe
+    # the keys per entry (ordered) to keep each id once per index list
+    types = dict.fromkeys([e.get("type") or "unknown", *e.get("inferred", [])])
+    for t in types:
+        by_type.setdefault(t, []).append(e["id"])
+    db = e.get("dbms")
+    if db:
+        by_dbms.setdefault(db, []).append(e["id"])
+    for tag in dict.fromkeys(e.get("tags", [])):
+        by_tag.setdefault(tag, []).append(e["id"])
 
 def build_catalog():
     entries = []
-    # parse expected xml files in payload dir
-    for fname in EXPECTED_XML:
-        p = PAYLOAD_DIR / fname
-        if p.exists():
-            entries.extend(parse_xml_file(p, fname.replace(".xml","")))
-    # also parse any other xmls in dir
-    for f in sorted(PAYLOAD_DIR.glob("*.xml")):
-        if f.name in EXPECTED_XML:
-            continue
-        entries.extend(parse_xml_file(f, f.name.replace(".xml","")))
-    # build indexes
     by_type = {}
     by_dbms = {}
     by_tag = {}
-    for e in entries:
-        t = e.get("type") or "unknown"
-        by_type.setdefault(t, []).append(e["id"])
-        db = e.get("dbms")
-        if db:
-            by_dbms.setdefault(db, []).append(e["id"])
-        for tag in e.get("tags", []):
-            by_tag.setdefault(tag, []).append(e["id"])
-        # also index inferred techniques
-        for it in e.get("inferred", []):
-            by_type.setdefault(it, []).append(e["id"])
+    # one scandir pass; entries carry d_type so no extra stat per name
+    with os.scandir(PAYLOAD_DIR) as it:
+        files = [e.name for e in it if e.name.endswith(".xml") and e.is_file()]
+    # single pass: expected files first, then any other xmls in dir. Entries
+    # are committed per file, so a malformed xml is skipped as a whole,
+    # exactly as PayloadDB._parse_xml does
+    for fname in sorted(files, key=lambda n: (n not in EXPECTED_XML, n)):
+        path = PAYLOAD_DIR / fname
+        try:
+            parsed = list(iter_entries(path, fname[:-4]))
+        except Exception as e:
+            print("skip", path, ":", e)
+            continue
+        for e in parsed:
+            entries.append(e)
+            _index_entry(e, by_type, by_dbms, by_tag)
     catalog = {
         "generated_at": datetime.utcnow().isoformat() + "Z",
         "count": len(entries),
@@ -177,7 +181,10 @@ def main():
         print("Payload dir not found:", PAYLOAD_DIR)
         return
     cat = build_catalog()
-    OUT_FILE.write_text(json.dumps(cat, indent=2), encoding="utf-8")
+    if orjson is not None:
+        OUT_FILE.write_bytes(orjson.dumps(cat, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        OUT_FILE.write_text(json.dumps(cat, indent=2), encoding="utf-8")
     print("Wrote catalog:", OUT_FILE, "entries:", cat["count"])
 
 if __name__ == "__main__":
@@ -31,9 +31,8 @@ def choose_candidates(pdb, vuln, limit=10):
     # try dbms+ptype first
     candidates = []
     if dbms_hint:
-        candidates = pdb.by_dbms(dbms_hint, limit=limit)
-        # filter those by ptype
-        candidates = [c for c in candidates if c.get("type")==ptype or ptype in c.get("inferred",[])]
+        # indexed dbms x technique intersection, limited after filtering
+        candidates = pdb.by_dbms_and_technique(dbms_hint, ptype, limit=limit)
     if not candidates:
         candidates = pdb.by_technique(ptype, limit=limit)
     if not candidates:
@@ -46,6 +45,10 @@ def render_preview(pdb, entry, ctx=None):
     ctx = ctx or {}
     return pdb.render(vec, ctx)
 
+def exploit(url, param, session=None):
+    # Temporary: nothing is sent yet, the finding is reported as unconfirmed
+    return {"url": url, "param": param, "exploited": False}
+
 def main(scanner_file: str, count: int = 5):
     project_root = Path(__file__).resolve().parent.parent
     pdb = load_payloads(payload_dir=str(project_root / "core_sql" / "payloads"))
@@ -59,6 +62,9 @@ def main(scanner_file: str, count: int = 5):
         print("No vulnerabilities found in scanner report.")
         return
 
+    # preview context is invariant across vulns/candidates: build it once
+    # (it pins RANDNUM/RANDSTR, so PayloadDB.render can memoise the output)
+    ctx = {"QUERY": "SELECT database()", "RANDNUM": 4242, "RANDSTR": "rndstr", "SLEEPTIME": 2}
     for i, v in enumerate(vulns, start=1):
         print("="*78)
         print(f"VULN {i}: id={v.get('id')} url={v.get('url')} param={v.get('param')} technique={v.get('technique')} dbms={v.get('dbms')}")
@@ -67,8 +73,6 @@ def main(scanner_file: str, count: int = 5):
             print("  No candidates found.")
             continue
         for j, c in enumerate(candidates, start=1):
-            # build a small context: prefer SLEEPTIME for time-based; add a RANDNUM
-            ctx = {"QUERY": "SELECT database()", "RANDNUM": 4242, "RANDSTR": "rndstr", "SLEEPTIME": 2}
             preview = render_preview(pdb, c, ctx)
             title = c.get("title") or c.get("source") or c.get("id")
             print(f"\n  [{j}] {title}")
@@ -16,21 +16,44 @@ Usage:
 """
 
 import os
-import xml.etree.ElementTree as ET
 import uuid
 import random
 import re
+import pickle
+import hashlib
+import tempfile
+import itertools
+import functools
+import ahocorasick
 from typing import List, Dict, Optional, Any, Callable
 
+try:
+    import lxml.etree as ET
+    USE_LXML = True
+except ImportError:
+    # stdlib fallback (C-accelerated in CPython), same streaming approach
+    import xml.etree.ElementTree as ET
+    USE_LXML = False
+
 DEFAULT_DIR = os.path.join(os.path.dirname(__file__), "payloads")
-EXPECTED_XML = [
+# parsed catalog cache (a pickle): kept in a per-user cache dir, never in the
+# payload dir, which may be third-party and must not feed pickle.load
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "sql-ai-security-tool",
+)
+CACHE_VERSION = 5
+# the numpy dbms column only beats the hash indexes on large catalogs;
+# below this many entries numpy is never imported
+COLUMNS_MIN_ENTRIES = 2000
+EXPECTED_XML = frozenset({
     "boolean_blind.xml",
     "error_based.xml",
     "inline_query.xml",
     "stacked_queries.xml",
     "time_blind.xml",
     "union_query.xml",
-]
+})
 
 # ----------------- heuristic helpers -----------------
 TECH_KEYWORDS = {
@@ -42,6 +65,74 @@ TECH_KEYWORDS = {
     "inline_query": [r"SELECT\s+\(", r"\bINLINE\b"]
 }
 
+# one compiled alternation per technique, built once at import
+TECH_RE = {
+    tech: re.compile("|".join(f"(?:{pat})" for pat in patterns), re.I | re.M)
+    for tech, patterns in TECH_KEYWORDS.items()
+}
+
+# one bit per technique so inference ORs small ints instead of building sets;
+# the name list is only materialised once per entry
+TECH_BITS = {
+    "time_blind": 1,
+    "union_query": 2,
+    "boolean_blind": 4,
+    "error_based": 8,
+    "stacked_queries": 16,
+    "inline_query": 32,
+}
+# canonical (alphabetical) order of the inferred list; decoding walks this
+# fixed universe instead of sorting per entry
+TECH_ORDER = ("boolean_blind", "error_based", "inline_query", "stacked_queries", "time_blind", "union_query")
+_ORDERED_BITS = tuple((t, TECH_BITS[t]) for t in TECH_ORDER)
+
+def _decode_bits(bits: int) -> list:
+    return [t for t, b in _ORDERED_BITS if bits & b]
+
+# literals whose mere presence proves a technique (no word-boundary semantics),
+# matched in a single Aho-Corasick pass over the upper-cased content
+TECH_LITERALS = {
+    "time_blind": ["[SLEEPTIME]"],
+    "union_query": ["DELIMITER_START"],
+    "boolean_blind": ["[INFERENCE]"],
+    "error_based": ["ERROR", "CAST(", "CONVERT(", "JSON_KEYS", "ORA-", "SQLSTATE"],
+}
+
+# substrings at least one of which must be present for a technique's regex
+# to match; cheap `in` checks let the common no-match case skip the regex
+TECH_GUARDS = {
+    "time_blind": ("SLEEP", "WAITFOR", "BENCHMARK"),
+    "union_query": ("UNION", "CONCAT", "DELIMITER_START"),
+    "boolean_blind": ("[INFERENCE]", "IF(", "ELT(", "CASE"),
+    "error_based": ("ERROR", "CAST(", "CONVERT(", "JSON_KEYS", "ORA-", "SQLSTATE"),
+    "stacked_queries": (";",),
+    "inline_query": ("SELECT", "INLINE"),
+}
+
+def _build_automaton(literals: dict) -> "ahocorasick.Automaton":
+    automaton = ahocorasick.Automaton()
+    for tech, words in literals.items():
+        for w in words:
+            automaton.add_word(w, automaton.get(w, 0) | TECH_BITS[tech])
+    automaton.make_automaton()
+    return automaton
+
+TECH_AUTOMATON = _build_automaton(TECH_LITERALS)
+
+def _infer_techniques(content: str) -> int:
+    content_upper = content.upper()
+    bits = 0
+    for _, b in TECH_AUTOMATON.iter(content_upper):
+        bits |= b
+    # regex residue only for techniques the literals did not already prove
+    for tech, rx in TECH_RE.items():
+        b = TECH_BITS[tech]
+        if bits & b:
+            continue
+        if any(s in content_upper for s in TECH_GUARDS[tech]) and rx.search(content):
+            bits |= b
+    return bits
+
 DBMS_PATTERNS = {
     "MySQL": re.compile(r"mysql", re.I),
     "PostgreSQL": re.compile(r"postgres|pg_sleep|postgresql", re.I),
@@ -50,6 +141,34 @@ DBMS_PATTERNS = {
     "SQLite": re.compile(r"sqlite", re.I)
 }
 
+# ----------------- rendering helpers -----------------
+PLACEHOLDER_RE = re.compile(r"\[(\w+)\]")
+WS_RE = re.compile(r"\s{2,}")
+
+# preview values are not security-sensitive: a module-level PRNG and a
+# pre-drawn RANDSTR pool avoid randint's overhead and uuid4's urandom call
+_R = random.Random()
+_RANDSTR_POOL = ["%08x" % _R.getrandbits(32) for _ in range(256)]
+
+_DEFAULT_PLACEHOLDERS: Dict[str, Callable[[], str]] = {
+    "RANDNUM": lambda: str(1000 + _R.getrandbits(14) % 9000),
+    "RANDSTR": lambda: _RANDSTR_POOL[_R.getrandbits(8)],
+}
+
+def _collapse_ws(out: str) -> str:
+    # best-effort: remove newlines and collapse excessive whitespace for HTTP sending
+    return WS_RE.sub(" ", out.replace("\n", " ")).strip()
+
+@functools.lru_cache(maxsize=4096, typed=True)
+def _render_fixed(template: str, ctx_items: frozenset) -> str:
+    # only used when ctx pins every lazily-drawn placeholder, so the output
+    # is deterministic and safe to memoise across candidates sharing a vector.
+    # ctx_items holds (key, type, value): typed=True only covers the top-level
+    # args, and 1 == True == 1.0 would otherwise share a cache slot
+    ctx = {k: v for k, _, v in ctx_items}
+    return _collapse_ws(PLACEHOLDER_RE.sub(
+        lambda m: str(ctx[m.group(1)]) if m.group(1) in ctx else m.group(0), template))
+
 # ----------------- entry construction -----------------
 def _new_entry():
     return {
@@ -68,11 +187,51 @@ def _new_entry():
         "inferred": [],          # inferred techniques from vector content
     }
 
+def _iter_tests(path: str):
+    """Yield each <test> element as it closes, freeing it once the caller is done."""
+    if USE_LXML:
+        for _, test in ET.iterparse(path, events=("end",), tag="test"):
+            yield test
+            # free the finished element and any already-processed siblings
+            test.clear()
+            while test.getprevious() is not None:
+                del test.getparent()[0]
+    else:
+        # stdlib iterparse has no tag filter or parent links: filter here and
+        # clear each finished <test>, leaving only an empty shell behind
+        for _, el in ET.iterparse(path, events=("end",)):
+            if el.tag == "test":
+                yield el
+                el.clear()
+
+def _first_children(el) -> dict:
+    # one walk over the children instead of a find()/findtext() per field;
+    # the first element per tag wins, same as find()
+    kids = {}
+    for child in el:
+        kids.setdefault(child.tag, child)
+    return kids
+
+def _text(kids: dict, tag: str):
+    el = kids.get(tag)
+    return el.text if el is not None else None
+
 # ----------------- parser / catalog builder -----------------
 class PayloadDB:
     def __init__(self, payload_dir: Optional[str] = None):
         self.payload_dir = os.path.abspath(payload_dir or DEFAULT_DIR)
         self.entries: List[Dict[str, Any]] = []
+        # hash indexes, populated once at the end of load()
+        self._by_dbms: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_tech: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_tag: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        # id sets alongside the lists, for dbms x technique intersection
+        self._by_dbms_ids: Dict[str, frozenset] = {}
+        self._by_tech_ids: Dict[str, frozenset] = {}
+        # numpy dbms column (one row per entry), only for large catalogs
+        self._dbms_codes: Dict[str, int] = {}
+        self._dbms_col = None
         self._loaded = False
         self.load()  # eager load by default
 
@@ -80,92 +239,197 @@ class PayloadDB:
         if self._loaded:
             return
         os.makedirs(self.payload_dir, exist_ok=True)
-        # load expected xml files if they exist directly in payload_dir
-        for fname in EXPECTED_XML:
-            fpath = os.path.join(self.payload_dir, fname)
-            if os.path.exists(fpath):
-                ptype = fname.replace(".xml", "")
-                self._parse_xml(fpath, ptype)
-        # also support if user put the xmls in a subfolder (like sqlmap_xml)
-        # scan directory for xml files and parse any found as best-effort
-        for fname in sorted(os.listdir(self.payload_dir)):
-            if fname.endswith(".xml") and fname not in EXPECTED_XML:
-                fpath = os.path.join(self.payload_dir, fname)
-                self._parse_xml(fpath, fname.replace(".xml", ""))
+        xml_files = self._xml_files()
+        sig = self._signature(xml_files)
+        if self._load_cache(sig):
+            self._build_columns()
+            self._loaded = True
+            return
+        # single pass: the known sqlmap files first, then any extra xml found
+        # in the dir (best-effort), each typed by its file name
+        for fname in sorted(xml_files, key=lambda n: (n not in EXPECTED_XML, n)):
+            self._parse_xml(os.path.join(self.payload_dir, fname), fname[:-4])
+        self._build_indexes()
+        self._build_columns()
+        self._save_cache(sig)
         self._loaded = True
 
+    def _xml_files(self) -> List[str]:
+        # scandir hands back d_type with each entry, so no extra stat per name
+        with os.scandir(self.payload_dir) as it:
+            return sorted(e.name for e in it if e.name.endswith(".xml") and e.is_file())
+
+    # ----------------- parsed-catalog cache -----------------
+    _INDEX_ATTRS = ("_by_dbms", "_by_tech", "_by_tag", "_by_id", "_by_dbms_ids", "_by_tech_ids")
+
+    def _signature(self, xml_files: List[str]):
+        # name/mtime/size of every xml so edits, additions and removals all invalidate
+        sig = []
+        for fname in xml_files:
+            st = os.stat(os.path.join(self.payload_dir, fname))
+            sig.append((fname, st.st_mtime_ns, st.st_size))
+        return (CACHE_VERSION, tuple(sig))
+
+    def _cache_path(self) -> str:
+        # one cache file per payload dir
+        digest = hashlib.blake2b(self.payload_dir.encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(CACHE_DIR, f"payloads_catalog-{digest}.pkl")
+
+    def _load_cache(self, sig) -> bool:
+        path = self._cache_path()
+        try:
+            with open(path, "rb") as fh:
+                cached_sig, entries, indexes = pickle.load(fh)
+        except Exception:
+            return False
+        if cached_sig != sig:
+            return False
+        self.entries = entries
+        for attr, index in zip(self._INDEX_ATTRS, indexes):
+            setattr(self, attr, index)
+        return True
+
+    def _save_cache(self, sig):
+        path = self._cache_path()
+        indexes = tuple(getattr(self, attr) for attr in self._INDEX_ATTRS)
+        tmp = None
+        try:
+            os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+            # a private temp file per writer: concurrent loads of the same
+            # payload dir never write into each other's file
+            fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump((sig, self.entries, indexes), fh, protocol=5)
+            os.replace(tmp, path)  # atomic, so a concurrent reader never sees a partial file
+        except OSError:
+            # unwritable cache dir: just reparse next time
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _build_indexes(self):
+        by_dbms, by_tech, by_tag, by_id = {}, {}, {}, {}
+        # dbms keys are lower-cased once here so by_dbms never re-lowers per
+        # entry; an entry is listed under its file type and every inferred
+        # technique, once each. Entries themselves carry only public fields.
+        for e in self.entries:
+            if e["dbms"]:
+                by_dbms.setdefault(e["dbms"].lower(), []).append(e)
+            for tech in dict.fromkeys([*e["inferred"], e["type"]]):
+                by_tech.setdefault(tech, []).append(e)
+            for tag in e["tags"]:
+                by_tag.setdefault(tag, []).append(e)
+            by_id[e["id"]] = e
+        self._by_dbms, self._by_tech, self._by_tag, self._by_id = by_dbms, by_tech, by_tag, by_id
+        self._by_dbms_ids = {k: frozenset(e["id"] for e in lst) for k, lst in by_dbms.items()}
+        self._by_tech_ids = {k: frozenset(e["id"] for e in lst) for k, lst in by_tech.items()}
+
+    def _build_columns(self):
+        # a dbms code per entry, so a multi-key by_dbms is one vectorised pass.
+        # Rebuilt from the entries rather than pickled, which keeps the cache
+        # loadable without numpy; numpy itself is imported only when used.
+        n = len(self.entries)
+        if n < COLUMNS_MIN_ENTRIES:
+            return
+        try:
+            import numpy as np
+        except ImportError:
+            return
+        self._dbms_codes = {k: i for i, k in enumerate(sorted(self._by_dbms), start=1)}  # 0 = no dbms
+        self._dbms_col = np.fromiter((self._dbms_codes.get((e["dbms"] or "").lower(), 0) for e in self.entries),
+                                     dtype=np.min_scalar_type(len(self._dbms_codes)), count=n)
+
+    def _dbms_rows(self, keys: List[str]) -> List[Dict[str, Any]]:
+        import numpy as np  # already loaded by _build_columns
+        mask = np.isin(self._dbms_col, [self._dbms_codes[k] for k in keys])
+        return [self.entries[i] for i in np.flatnonzero(mask)]
+
+    def _lookup(self, index: Dict[str, List[Dict[str, Any]]], keys: List[str]) -> List[Dict[str, Any]]:
+        # a single matching key is a plain O(k) index hit; several keys are
+        # merged back in catalog order without duplicates
+        if not keys:
+            return []
+        if len(keys) == 1:
+            return list(index[keys[0]])
+        hits = {id(e) for k in keys for e in index[k]}
+        return [e for e in self.entries if id(e) in hits]
+
     def _parse_xml(self, path: str, ptype: str):
+        # stream <test> elements as they close instead of loading the whole tree;
+        # entries are only committed once the file parsed cleanly
+        parsed = []
         try:
-            tree = ET.parse(path)
-            root = tree.getroot()
+            for test in _iter_tests(path):
+                e = self._entry_from_test(test, path, ptype)
+                if e is not None:
+                    parsed.append(e)
         except Exception:
             return
-        for test in root.findall("test"):
-            e = _new_entry()
-            e["source"] = os.path.basename(path)
-            e["type"] = ptype
-            e["title"] = (test.findtext("title") or "").strip()
-            # vector
-            v_el = test.find("vector")
-            if v_el is not None and v_el.text:
-                e["vector"] = v_el.text.strip()
-            # request/payload example
-            req = test.find("request")
-            if req is not None:
-                p = req.find("payload")
-                if p is not None and p.text:
-                    e["example"] = p.text.strip()
-                # comment token (useful to render correctly)
-                c = req.find("comment")
-                if c is not None and c.text:
-                    e["tags"].append("comment_token:" + c.text.strip())
-            # response grep/time
-            resp = test.find("response")
-            if resp is not None:
-                g = resp.find("grep")
-                if g is not None and g.text:
-                    e["grep"] = g.text.strip()
-                t = resp.find("time")
-                if t is not None and t.text:
-                    e["tags"].append("response_time_marker")
-            # details
-            det = test.find("details")
-            if det is not None:
-                db = det.findtext("dbms")
-                dv = det.findtext("dbms_version")
-                if db:
-                    e["dbms"] = db.strip()
-                if dv:
-                    e["dbms_version"] = dv.strip()
-            # level / risk
-            lvl = test.findtext("level")
-            rsk = test.findtext("risk")
-            e["level"] = int(lvl) if lvl and lvl.isdigit() else None
-            e["risk"] = int(rsk) if rsk and rsk.isdigit() else None
-
-            # infer techniques from vector / example / tags
-            content = " ".join(filter(None, [e.get("vector") or "", e.get("example") or ""]))
-            inferred = set()
-            for tech, patterns in TECH_KEYWORDS.items():
-                for pat in patterns:
-                    if re.search(pat, content, re.I | re.M):
-                        inferred.add(tech)
-                        break
-            # also prefer file-based type as technique if it's one of known categories
-            if ptype in TECH_KEYWORDS.keys():
-                inferred.add(ptype)
-            # stacked queries often appear as leading semicolon or file name 'stacked'
-            if ptype and "stacked" in ptype:
-                inferred.add("stacked_queries")
-            # add inferred list and some auto tags
-            e["inferred"] = sorted(list(inferred))
-            # add a simple tag if dbms specified
-            if e["dbms"]:
-                e["tags"].append("dbms:" + e["dbms"])
-            # ensure vector or example exists
-            if not e["vector"] and not e["example"]:
-                continue
-            self.entries.append(e)
+        self.entries.extend(parsed)
+
+    def _entry_from_test(self, test, path: str, ptype: str) -> Optional[Dict[str, Any]]:
+        e = _new_entry()
+        e["source"] = os.path.basename(path)
+        e["type"] = ptype
+        kids = _first_children(test)
+        e["title"] = (_text(kids, "title") or "").strip()
+        # vector
+        vec = _text(kids, "vector")
+        if vec:
+            e["vector"] = vec.strip()
+        # request/payload example
+        req = kids.get("request")
+        if req is not None:
+            req_kids = _first_children(req)
+            p = _text(req_kids, "payload")
+            if p:
+                e["example"] = p.strip()
+            # comment token (useful to render correctly)
+            c = _text(req_kids, "comment")
+            if c:
+                e["tags"].append("comment_token:" + c.strip())
+        # response grep/time
+        resp = kids.get("response")
+        if resp is not None:
+            resp_kids = _first_children(resp)
+            g = _text(resp_kids, "grep")
+            if g:
+                e["grep"] = g.strip()
+            if _text(resp_kids, "time"):
+                e["tags"].append("response_time_marker")
+        # details
+        det = kids.get("details")
+        if det is not None:
+            det_kids = _first_children(det)
+            db = _text(det_kids, "dbms")
+            dv = _text(det_kids, "dbms_version")
+            if db:
+                e["dbms"] = db.strip()
+            if dv:
+                e["dbms_version"] = dv.strip()
+        # level / risk
+        lvl = _text(kids, "level")
+        rsk = _text(kids, "risk")
+        e["level"] = int(lvl) if lvl and lvl.isdigit() else None
+        e["risk"] = int(rsk) if rsk and rsk.isdigit() else None
+
+        # infer techniques from vector / example / tags
+        content = " ".join(filter(None, [e.get("vector") or "", e.get("example") or ""]))
+        bits = _infer_techniques(content)
+        # also prefer file-based type as technique if it's one of known categories
+        if ptype in TECH_BITS:
+            bits |= TECH_BITS[ptype]
+        # stacked queries often appear as leading semicolon or file name 'stacked'
+        if ptype and "stacked" in ptype:
+            bits |= TECH_BITS["stacked_queries"]
+        # add inferred list and some auto tags
+        e["inferred"] = _decode_bits(bits)
+        # add a simple tag if dbms specified
+        if e["dbms"]:
+            e["tags"].append("dbms:" + e["dbms"])
+        # ensure vector or example exists
+        if not e["vector"] and not e["example"]:
+            return None
+        return e
 
     # ----------------- retrieval APIs -----------------
     def all(self) -> List[Dict[str, Any]]:
@@ -178,7 +442,13 @@ class PayloadDB:
         return sorted(list({(e.get("dbms") or "").strip() for e in self.entries if e.get("dbms")}))
 
     def by_dbms(self, dbms: str, limit: Optional[int] = None, safety: Optional[str] = None) -> List[Dict[str, Any]]:
-        res = [e for e in self.entries if e.get("dbms") and dbms.lower() in e.get("dbms").lower()]
+        dbms_lc = dbms.lower()
+        # substring match against the handful of distinct dbms keys, not every entry
+        keys = [k for k in self._by_dbms if dbms_lc in k]
+        if self._dbms_col is not None and len(keys) > 1:
+            res = self._dbms_rows(keys)
+        else:
+            res = self._lookup(self._by_dbms, keys)
         if safety:
             # naive safety filter by risk: safety "non-destructive" -> risk <=2, "may-alter-db" -> <=4 else destructive
             if safety == "non-destructive":
@@ -189,18 +459,34 @@ class PayloadDB:
 
     def by_technique(self, technique: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         # technique should be one of the TECH_KEYWORDS keys or the xml filename base
-        res = [e for e in self.entries if technique == e.get("type") or technique in e.get("inferred", [])]
+        res = list(self._by_tech.get(technique, []))
         return res[:limit] if limit else res
 
+    def by_dbms_and_technique(self, dbms: str, technique: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries matching both a dbms (substring, like by_dbms) and a technique, in catalog order."""
+        dbms_lc = dbms.lower()
+        keys = [k for k in self._by_dbms if dbms_lc in k]
+        tech_list = self._by_tech.get(technique, [])
+        if not keys or not tech_list:
+            return []
+        if len(keys) == 1:
+            dbms_ids = self._by_dbms_ids[keys[0]]
+        else:
+            dbms_ids = frozenset().union(*(self._by_dbms_ids[k] for k in keys))
+        # walk the shorter side and probe the other's id set
+        if len(tech_list) <= len(dbms_ids):
+            res = (e for e in tech_list if e["id"] in dbms_ids)
+        else:
+            tech_ids = self._by_tech_ids[technique]
+            res = (e for e in self._lookup(self._by_dbms, keys) if e["id"] in tech_ids)
+        return list(itertools.islice(res, limit or None))
+
     def by_tag(self, tag: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        res = [e for e in self.entries if any(t.startswith(tag) or t == tag for t in e.get("tags", []))]
+        res = self._lookup(self._by_tag, [t for t in self._by_tag if t.startswith(tag)])
         return res[:limit] if limit else res
 
     def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
-        for e in self.entries:
-            if e["id"] == entry_id:
-                return e
-        return None
+        return self._by_id.get(entry_id)
 
     def sample(self, technique: Optional[str] = None, dbms: Optional[str] = None) -> Optional[Dict[str, Any]]:
         if technique:
@@ -222,20 +508,27 @@ class PayloadDB:
         """
         if not template:
             return template
-        out = template
         ctx = context or {}
-        # bracketed placeholders
-        for k, v in ctx.items():
-            out = out.replace(f"[{k}]", str(v))
-        # supply RANDNUM/RANDSTR if missing
-        if "[RANDNUM]" in out and "RANDNUM" not in ctx:
-            out = out.replace("[RANDNUM]", str(random.randint(1000, 9999)))
-        if "[RANDSTR]" in out and "RANDSTR" not in ctx:
-            out = out.replace("[RANDSTR]", uuid.uuid4().hex[:8])
-        # best-effort: remove newlines and collapse excessive whitespace for HTTP sending
-        out = "\n".join(line.strip() for line in out.splitlines())
-        out = re.sub(r"\s{2,}", " ", out)
-        return out
+        if _DEFAULT_PLACEHOLDERS.keys() <= ctx.keys():
+            try:
+                return _render_fixed(template, frozenset((k, type(v), v) for k, v in ctx.items()))
+            except TypeError:
+                pass  # unhashable context value: render uncached below
+        # RANDNUM/RANDSTR defaults are drawn lazily, once per call, so repeated
+        # placeholders (e.g. "[RANDNUM]=[RANDNUM]") stay consistent
+        defaults: Dict[str, str] = {}
+
+        def _rep(m):
+            k = m.group(1)
+            if k in ctx:
+                return str(ctx[k])
+            if k in _DEFAULT_PLACEHOLDERS:
+                if k not in defaults:
+                    defaults[k] = _DEFAULT_PLACEHOLDERS[k]()
+                return defaults[k]
+            return m.group(0)
+
+        return _collapse_ws(PLACEHOLDER_RE.sub(_rep, template))
 
 # ----------------- module-level convenience -----------------
 _global_db: Optional[PayloadDB] = None
@@ -1,3 +1,3 @@
-def scan(url, params):
+def scan(url, params, session=None):
     # Temporary: pretend everything is vulnerable
     return {"url": url, "param": params[0], "payload": "' OR '1'='1", "vulnerable": True}
@@ -5,14 +5,147 @@ Main entry point for CLI usage.
 """
 
 import argparse
+import asyncio
+import importlib
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Import project modules
-from utils import logger, output
+from utils import logger, output, http_client
+from utils.cache import ResultCache, make_key
 from core_api import crawler
 from core_sql import scanner, injector
-from core_ai import inference
+
+
+async def _supervise(*coros):
+    """Run coros as concurrent tasks. The first failure cancels the rest and
+    is re-raised, so a dead stage can never leave its peers blocked on a
+    full queue."""
+    tasks = [asyncio.create_task(coro) for coro in coros]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for task in done:
+        task.result()
+
+
+async def run_pipeline(url, session, cache, report, max_concurrent=10, chunk_size=500):
+    """
+    Crawl, scan/exploit and explain as overlapping stages joined by queues:
+    endpoints reach the scanners as soon as the crawl yields them (all at
+    once if crawl() returns a list rather than an iterator), and
+    vulnerable findings reach the AI advisor as soon as a scan confirms them.
+    Every endpoint, vulnerability, exploitation result and AI explanation
+    is streamed to `report` (a ReportWriter) as soon as it exists.
+    At most `chunk_size` items wait in each queue and in each AI batch,
+    so peak memory stays flat however many endpoints the crawl returns.
+    """
+    # every to_thread call (crawl, scan, exploit, explain) runs on one pool
+    # sized for the scan workers plus the crawler and the advisor; the
+    # default executor (min(32, cpus + 4) threads) would silently cap
+    # --max-concurrent-scans. asyncio.run shuts it down on exit.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=max_concurrent + 2, thread_name_prefix="sql-ai")
+    )
+    endpoint_q = asyncio.Queue(maxsize=chunk_size)
+    vuln_q = asyncio.Queue(maxsize=chunk_size)
+    # only one answer per distinct finding is kept, not the findings themselves
+    results_by_key = {}
+
+    async def crawl_producer():
+        # ------------------------------
+        # Step 1: Crawl API endpoints
+        # ------------------------------
+        logger.log_info("Crawling target for endpoints...")
+        # crawl() may return a list or a lazy iterator; either way it is only
+        # ever advanced on a worker thread, one endpoint per hop, so scanning
+        # starts on the first endpoint and the loop never runs the crawl
+        found = await asyncio.to_thread(lambda: iter(crawler.crawl(url, session=session) or ()))
+        # the same endpoint is often linked from several pages: probe it once
+        seen = set()
+        while (ep := await asyncio.to_thread(next, found, None)) is not None:
+            key = (ep["url"], tuple(sorted(ep.get("params", []))))
+            if key in seen:
+                continue
+            if not seen:
+                logger.log_info("Running SQLi scanner...")
+            seen.add(key)
+            report.write("endpoints", ep)
+            await endpoint_q.put(ep)
+        # one shutdown sentinel per scan worker
+        for _ in range(max_concurrent):
+            await endpoint_q.put(None)
+
+    async def scan_worker():
+        # ------------------------------
+        # Step 2: SQL Injection Scan + Step 3: Exploitation (if vuln)
+        # ------------------------------
+        while (ep := await endpoint_q.get()) is not None:
+            result = await asyncio.to_thread(scanner.scan, ep["url"], ep.get("params", []), session=session)
+            if not result:
+                continue
+            report.write("vulnerabilities", result)
+            if not result.get("vulnerable"):
+                continue
+            # the same vulnerable subset feeds exploitation and the AI advisor
+            exploit = await asyncio.to_thread(injector.exploit, result["url"], result["param"], session=session)
+            report.write("exploitation", exploit)
+            await vuln_q.put(result)
+
+    async def explain_worker():
+        # ------------------------------
+        # Step 4: AI Explanation
+        # ------------------------------
+        # skipped entirely on a clean target: the AI advisor is only
+        # imported (never at module level) once the first finding arrives,
+        # and on a worker thread so a slow model load never stalls the loop
+        first = await vuln_q.get()
+        if first is None:
+            return
+        inference = await asyncio.to_thread(importlib.import_module, "core_ai.inference")
+        logger.log_info("Asking AI Advisor for explanation...")
+        batch, done = [first], False
+        while not done:
+            # micro-batch everything already queued; the sentinel is always last
+            batch.extend(vuln_q.get_nowait() for _ in range(min(vuln_q.qsize(), chunk_size - 1)))
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            # explain each distinct finding once, cache first
+            keys = [inference.explain_key(vuln) for vuln in batch]
+            unique = {key: vuln for key, vuln in zip(keys, batch) if key not in results_by_key}
+            # SQLite reads and writes run off the event loop, once per batch
+            cache_keys = {key: make_key(key, inference.ADVISOR_VERSION) for key in unique}
+            hits = await asyncio.to_thread(cache.get_many, list(cache_keys.values()))
+            cached = {key: hits.get(cache_key) for key, cache_key in cache_keys.items()}
+            results_by_key.update((key, hit) for key, hit in cached.items() if hit is not None)
+            pending = {key: vuln for key, vuln in unique.items() if cached[key] is None}
+            if pending:
+                fresh = await asyncio.to_thread(inference.explain_batch, list(pending.values()))
+                answers = dict(zip(pending, fresh))
+                results_by_key.update(answers)
+                await asyncio.to_thread(cache.set_many, [(cache_keys[key], a) for key, a in answers.items()])
+            # fan the per-key answers back out, one record per finding
+            for vuln, key in zip(batch, keys):
+                report.write("ai_explanations", {
+                    "url": vuln.get("url"),
+                    "param": vuln.get("param"),
+                    "explanation": results_by_key[key],
+                })
+            if not done:
+                batch = [await vuln_q.get()]
+
+    async def scan_stage():
+        await _supervise(crawl_producer(), *(scan_worker() for _ in range(max_concurrent)))
+        await vuln_q.put(None)
+
+    # the explainer drains the bounded vuln_q: if either side fails, the
+    # other is cancelled and the error ends the run instead of a hang
+    await _supervise(scan_stage(), explain_worker())
 
 
 def main():
@@ -30,62 +163,45 @@ def main():
         default="report.json",
         help="Output file name (default: report.json)"
     )
+    parser.add_argument(
+        "--max-concurrent-scans",
+        type=int,
+        default=10,
+        help="Maximum number of endpoints scanned in parallel (default: 10)"
+    )
+    parser.add_argument(
+        "--cache",
+        default=".sql_ai_cache.sqlite",
+        help="SQLite file caching AI explanations between runs (default: .sql_ai_cache.sqlite)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help="Maximum number of endpoints/findings held in memory per stage (default: 500)"
+    )
     args = parser.parse_args()
+    if args.max_concurrent_scans < 1:
+        parser.error("--max-concurrent-scans must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
 
     logger.log_info("Starting SQL-AI Security Tool...")
 
-    # ------------------------------
-    # Step 1: Crawl API endpoints
-    # ------------------------------
-    logger.log_info("Crawling target for endpoints...")
-    endpoints = crawler.crawl(args.url)  # expected to return a list of dicts
+    # one pooled keep-alive session for crawl, scan and exploit, with a
+    # connection per scan worker plus one for the crawler; the SQLite
+    # cache lets repeat runs skip the AI advisor. The report (Step 5) keeps
+    # the save_json layout but each item is spooled to disk as it is produced.
+    with http_client.create_session(args.max_concurrent_scans + 1) as session, \
+            ResultCache(args.cache) as cache, output.ReportWriter(args.output, args.url) as report:
+        asyncio.run(run_pipeline(args.url, session, cache, report,
+                                 args.max_concurrent_scans, args.chunk_size))
 
-    if not endpoints:
+    if not report.counts["endpoints"]:
         logger.log_warning("No endpoints discovered. Exiting.")
         sys.exit(0)
 
-    # ------------------------------
-    # Step 2: SQL Injection Scan
-    # ------------------------------
-    logger.log_info("Running SQLi scanner...")
-    scan_results = []
-    for ep in endpoints:
-        result = scanner.scan(ep["url"], ep.get("params", []))
-        if result:
-            scan_results.append(result)
-
-    # ------------------------------
-    # Step 3: Exploitation (if vuln)
-    # ------------------------------
-    exploitation_results = []
-    for vuln in scan_results:
-        if vuln.get("vulnerable"):
-            exploit = injector.exploit(vuln["url"], vuln["param"])
-            exploitation_results.append(exploit)
-
-    # ------------------------------
-    # Step 4: AI Explanation
-    # ------------------------------
-    logger.log_info("Asking AI Advisor for explanation...")
-    explanations = []
-    for vuln in scan_results:
-        explanation = inference.explain(vuln)
-        explanations.append(explanation)
-
-    # ------------------------------
-    # Step 5: Generate Report
-    # ------------------------------
-    final_report = {
-        "target": args.url,
-        "endpoints": endpoints,
-        "vulnerabilities": scan_results,
-        "exploitation": exploitation_results,
-        "ai_explanations": explanations
-    }
-
-    output.save_json(final_report, args.output)
     logger.log_success(f"Report saved to {args.output}")
 
-
 if __name__ == "__main__":
     main()
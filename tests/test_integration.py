@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+
+import main
+from core_ai import inference
+from core_api import crawler
+from core_sql import injector, scanner
+from utils.cache import ResultCache
+from utils.output import ReportWriter
+
+
+def _fake_target(monkeypatch, n):
+    monkeypatch.setattr(crawler, "crawl", lambda url, session=None: [
+        {"url": f"{url}/e{i}", "params": ["id"]} for i in range(n)
+    ])
+    monkeypatch.setattr(scanner, "scan", lambda url, params, session=None: {
+        "url": url, "param": params[0], "payload": "'", "vulnerable": True,
+    })
+    monkeypatch.setattr(injector, "exploit", lambda url, param, session=None: {
+        "url": url, "param": param,
+    })
+
+
+def _run(tmp_path, **kwargs):
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache, \
+            ReportWriter(str(tmp_path / "report.json"), "http://t") as report:
+        coro = main.run_pipeline("http://t", None, cache, report, **kwargs)
+        asyncio.run(asyncio.wait_for(coro, timeout=10))
+        return report.counts
+
+
+def test_pipeline_reports_every_finding(tmp_path, monkeypatch):
+    _fake_target(monkeypatch, 50)
+    counts = _run(tmp_path, max_concurrent=4, chunk_size=5)
+    assert counts == {"endpoints": 50, "vulnerabilities": 50, "exploitation": 50, "ai_explanations": 50}
+
+
+def test_failing_explainer_ends_the_run(tmp_path, monkeypatch):
+    # more findings than the bounded queue holds: scanners must not hang
+    # once the advisor is gone
+    _fake_target(monkeypatch, 50)
+
+    def advisor_down(vulns):
+        raise RuntimeError("advisor down")
+
+    monkeypatch.setattr(inference, "explain_batch", advisor_down)
+    with pytest.raises(RuntimeError, match="advisor down"):
+        _run(tmp_path, max_concurrent=4, chunk_size=5)
+
+
+def test_lazy_crawl_overlaps_scanning(tmp_path, monkeypatch):
+    _fake_target(monkeypatch, 0)
+    first_scanned = threading.Event()
+
+    def crawl(url, session=None):
+        yield {"url": f"{url}/e0", "params": ["id"]}
+        # only reachable if e0 was scanned while the crawl was still running
+        assert first_scanned.wait(timeout=5), "scanning waited for the whole crawl"
+        yield {"url": f"{url}/e1", "params": ["id"]}
+
+    def scan(url, params, session=None):
+        first_scanned.set()
+        return {"url": url, "param": params[0], "payload": "'", "vulnerable": False}
+
+    monkeypatch.setattr(crawler, "crawl", crawl)
+    monkeypatch.setattr(scanner, "scan", scan)
+    counts = _run(tmp_path, max_concurrent=2)
+    assert counts["endpoints"] == 2 and counts["vulnerabilities"] == 2
@@ -0,0 +1,56 @@
+import pytest
+
+from core_sql import payloads
+from core_sql.payloads import TECH_ORDER, PayloadDB
+
+
+@pytest.fixture(scope="module")
+def pdb(tmp_path_factory):
+    # parse the bundled catalog without touching the user's cache dir
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(payloads, "CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        yield PayloadDB()
+
+
+def _matches_dbms(entry, dbms):
+    return dbms.lower() in (entry["dbms"] or "").lower()
+
+
+def _matches_technique(entry, technique):
+    return technique in entry["inferred"] or entry["type"] == technique
+
+
+@pytest.mark.parametrize("dbms", ["MySQL", "oracle", "SQL", "Microsoft", "NoSuchDB"])
+@pytest.mark.parametrize("limit", [None, 1, 3])
+def test_by_dbms_and_technique_matches_brute_force(pdb, dbms, limit):
+    for technique in TECH_ORDER + ("no_such_technique",):
+        expected = [e for e in pdb.all() if _matches_dbms(e, dbms) and _matches_technique(e, technique)]
+        assert pdb.by_dbms_and_technique(dbms, technique, limit=limit) == expected[:limit]
+
+
+def test_by_dbms_merges_several_keys_in_catalog_order(pdb):
+    # "sql" matches mysql, postgresql, sqlite, microsoft sql server, ...
+    assert len([k for k in pdb._by_dbms if "sql" in k]) > 1
+    expected = [e for e in pdb.all() if _matches_dbms(e, "SQL")]
+    result = pdb.by_dbms("SQL")
+    assert result == expected
+    assert len({e["id"] for e in result}) == len(result)
+    assert pdb.by_dbms("SQL", limit=5) == expected[:5]
+
+
+def test_by_tag_merges_prefix_matches_in_catalog_order(pdb):
+    expected = [e for e in pdb.all() if any(t.startswith("dbms:") for t in e["tags"])]
+    result = pdb.by_tag("dbms:")
+    assert result == expected
+    assert len({e["id"] for e in result}) == len(result)
+
+
+def test_render_keeps_equal_values_of_different_types_apart(pdb):
+    # 1 == True == 1.0, but each must render as itself despite the memo
+    outputs = [pdb.render("x=[RANDNUM]", {"RANDNUM": value, "RANDSTR": "a"}) for value in (1, True, 1.0)]
+    assert outputs == ["x=1", "x=True", "x=1.0"]
+
+
+def test_render_with_unhashable_context_value(pdb):
+    ctx = {"RANDNUM": [1, 2], "RANDSTR": "a", "QUERY": {"q": 1}}
+    assert pdb.render("x=[RANDNUM] [QUERY] [RANDSTR]", ctx) == "x=[1, 2] {'q': 1} a"
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import sqlite3
+
+
+def make_key(obj, version=None):
+    """Stable hash of any JSON-serialisable value (dict key order ignored).
+    `version` names whatever produced the cached value, so bumping it turns
+    every old entry into a miss instead of a stale hit."""
+    raw = json.dumps([version, obj], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=20).hexdigest()
+
+
+class ResultCache:
+    """Persistent key/value cache in SQLite, used to skip repeated AI
+    explanations (or any other deterministic, expensive call) across runs."""
+
+    # SQLite's bound-parameter limit is 999 on older builds
+    _MAX_VARS = 500
+
+    def __init__(self, path):
+        # callers may hop threads (asyncio.to_thread) but never use the
+        # connection from two threads at once
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB)"
+        )
+        self.conn.commit()
+
+    def get(self, key):
+        row = self.conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, keys):
+        """{key: value} for the keys that are cached, in one query per 500 keys."""
+        found = {}
+        for i in range(0, len(keys), self._MAX_VARS):
+            chunk = keys[i:i + self._MAX_VARS]
+            rows = self.conn.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update((k, json.loads(v)) for k, v in rows)
+        return found
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        """Store (key, value) pairs with one executemany and a single commit."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+            ((key, json.dumps(value)) for key, value in items),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,18 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size=32, pool_hosts=10):
+    """Keep-alive session shared by crawler, scanner and injector so
+    connections (and TLS handshakes) are reused across requests.
+
+    pool_size caps open connections per host (callers size it to their
+    concurrency); pool_hosts is how many per-host pools stay cached.
+    pool_block makes extra workers wait for a free connection instead of
+    opening throwaway ones that urllib3 discards once the pool is full.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -1,3 +1,23 @@
-def log_info(msg): print(f"[INFO] {msg}")
-def log_warning(msg): print(f"[WARN] {msg}")
-def log_success(msg): print(f"[OK] {msg}")
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+# callers only enqueue the record; a background QueueListener thread owns
+# the stdout handler and does the formatting and I/O off the hot path
+_queue = queue.SimpleQueue()
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("[%(tag)s] %(message)s"))
+_listener = logging.handlers.QueueListener(_queue, _handler)
+_listener.start()
+atexit.register(_listener.stop)  # drains the queue before exit
+
+_log = logging.getLogger("sql_ai")
+_log.setLevel(logging.INFO)
+_log.propagate = False
+_log.addHandler(logging.handlers.QueueHandler(_queue))
+
+def log_info(msg): _log.info(msg, extra={"tag": "INFO"})
+def log_warning(msg): _log.warning(msg, extra={"tag": "WARN"})
+def log_success(msg): _log.info(msg, extra={"tag": "OK"})
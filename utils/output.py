@@ -1,5 +1,66 @@
 import json
+import shutil
+import tempfile
+
+try:
+    import orjson  # optional C encoder, much faster on large reports
+except ImportError:
+    orjson = None
+
+
+def _dumps(data, indent=False):
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    # same bytes as orjson (2-space indent, raw UTF-8, compact separators),
+    # so the report does not depend on whether orjson is installed
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
 
 def save_json(data, filename):
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=4)
+    with open(filename, "wb") as f:
+        f.write(_dumps(data, indent=True))
+
+
+class ReportWriter:
+    """Report in the save_json layout ({"target": ..., "endpoints": [...],
+    "vulnerabilities": [...], "exploitation": [...], "ai_explanations": [...]})
+    written incrementally: each item is serialised into its section's spool
+    file as soon as it is produced, and the object is stitched together on
+    close, so no section is ever held in memory."""
+
+    SECTIONS = ("endpoints", "vulnerabilities", "exploitation", "ai_explanations")
+
+    def __init__(self, filename, target):
+        self.filename = filename
+        self.target = target
+        self._spools = {name: tempfile.TemporaryFile() for name in self.SECTIONS}
+        self.counts = dict.fromkeys(self.SECTIONS, 0)
+
+    def write(self, section, item):
+        spool = self._spools[section]
+        if self.counts[section]:
+            spool.write(b",\n")
+        spool.write(_dumps(item))
+        self.counts[section] += 1
+
+    def close(self):
+        with open(self.filename, "wb") as f:
+            f.write(b'{\n"target": ' + _dumps(self.target))
+            for name, spool in self._spools.items():
+                f.write(b',\n"' + name.encode("ascii") + b'": [\n')
+                spool.seek(0)
+                shutil.copyfileobj(spool, f)
+                spool.close()
+                f.write(b"\n]")
+            f.write(b"\n}\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()